@@ -0,0 +1,471 @@
+# card_parser.py
+# 釣割の釣果一覧ページから釣果カード（li.catch_item）を抽出するパーサーバックエンド群です。
+# BeautifulSoupで木構造を組み立てる従来版と、html.parser.HTMLParserのタグイベントだけで
+# 必要な項目を拾う高速版を用意し、ch.pyからは同じインターフェースで切り替えて使います。
+#
+# 各バックエンドはページのバイト列を受け取り、カードごとに (card_html, extract) のリストを返します。
+#   card_html : ページ上のカードのHTMLそのまま（キャッシュのキーに使用。どのバックエンドでも同じ）
+#   extract   : 呼び出すとカードの生データ
+#               {'shop_name': str|None, 'date_text': str|None, 'fish_rows': [(th_text, [td_text, ...]), ...]}
+#               を返す関数（キャッシュにヒットしたカードは呼び出されない）
+import re
+import html
+from collections import Counter
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit, EntitySubstitution
+
+# --- 共通処理 ---
+def build_card_results(card_data, pref_name):
+    """カードの生データを正規化し、魚ごとの釣果データのリストを返す"""
+    results = []
+
+    shop_name = card_data['shop_name'].strip() if card_data['shop_name'] is not None else "N/A"
+    date_text = card_data['date_text'].strip() if card_data['date_text'] is not None else "N/A"
+
+    match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', date_text)
+    if not match:
+        return results
+
+    year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+    report_date = f"{year:04d}-{month:02d}-{day:02d}"
+
+    for th_text, td_texts in card_data['fish_rows']:
+        if th_text is None:
+            continue
+
+        fish_name = re.sub(r'[（\(].*?[）\)]', '', th_text).strip()
+        if not fish_name:
+            continue
+
+        details = ' '.join(td.strip() for td in td_texts).strip()
+
+        results.append({
+            "report_date": report_date,
+            "prefecture": pref_name,
+            "shop_name": shop_name,
+            "fish_name": fish_name,
+            "details": details
+        })
+
+    return results
+
+# --- BeautifulSoup版 ---
+def _extract_bs4_card(card):
+    """BeautifulSoupのカード要素から生データを取り出す"""
+    shop_name_tag = card.select_one('header h2')
+    date_tag = card.select_one('.catch_item_date')
+
+    fish_rows = []
+    for row in card.select('.catch_item_fish tr'):
+        fish_name_tag = row.select_one('th')
+        fish_rows.append((
+            fish_name_tag.text if fish_name_tag else None,
+            [td.text for td in row.select('td')]
+        ))
+
+    return {
+        'shop_name': shop_name_tag.text if shop_name_tag else None,
+        'date_text': date_tag.text if date_tag else None,
+        'fish_rows': fish_rows
+    }
+
+def extract_cards_bs4(content):
+    """BeautifulSoupでページ全体を解析し、カードを抽出する（従来の処理）
+
+    カードの範囲は高速版と同じ走査で調べ、BeautifulSoupの木は最初に extract が呼ばれたときに
+    走査で文字列にしたページから1度だけ作る。全カードがキャッシュにヒットしたページでは木を作らないが、
+    1件でもミスがあれば走査の分だけ導入前の処理より遅くなる。比較・確認用の参照実装として残している。
+    """
+    text, cards = _scan(content)
+    soup_cards = []
+
+    def extract(index):
+        if not soup_cards:
+            soup = BeautifulSoup(text, 'html.parser')
+            soup_cards.extend(soup.select('li.catch_item'))
+            if len(soup_cards) != len(cards):
+                raise ValueError(
+                    f"カード数が一致しません (走査 {len(cards)}件 / BeautifulSoup {len(soup_cards)}件)"
+                )
+        return _extract_bs4_card(soup_cards[index])
+
+    return [
+        (text[card['start']:card['end']], lambda index=index: extract(index))
+        for index, card in enumerate(cards)
+    ]
+
+# --- 高速版（HTMLParserのタグイベントのみで抽出） ---
+# BeautifulSoup(html.parser)と同じ規則でタグを開閉し、木を作らずに必要な文字列だけを拾う。
+# ページ全体はカードの範囲を調べる走査（_CardBoundaryScanner）だけを行い、
+# 各カードの中身はextractが呼ばれたときに、カードの開始位置からカードが閉じるまでを解析する（_CardFieldExtractor）。
+# 入れ子のカード、終了タグの省略、CDATA、文字参照、空白の畳み込みもBeautifulSoup版と同じ結果になる。
+
+# BeautifulSoup(html.parser)が空要素として扱うタグ。開いた直後に閉じる。
+_VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+    'nextid', 'spacer'
+}
+# 中の文字列がNavigableString以外の型になるタグ（通常の要素の .text には含まれない）
+_STRING_CONTAINER_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+# 空白を畳まないタグ
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+_ASCII_SPACES = ' \n\t\x0c\r'
+# 通常の要素の .text に含まれる文字列の種類
+_TEXT_KINDS = frozenset({'text', 'cdata'})
+
+def decode_page(content):
+    """BeautifulSoupと同じくUnicodeDammit（BOM→宣言→推定の順）でページを文字列にする"""
+    if isinstance(content, str):
+        return content
+    dammit = UnicodeDammit(content, is_html=True)
+    if dammit.unicode_markup is None:
+        raise ValueError("ページの文字コードを判定できませんでした。")
+    return dammit.unicode_markup
+
+def _resolve_charref(name):
+    """数値文字参照を文字にする（BeautifulSoupと同じくHTML仕様の規則に従う）"""
+    number = int(name[1:], 16) if name[:1] in ('x', 'X') else int(name)
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return '\ufffd'
+    if 0x80 <= number <= 0x9F:
+        # Windows-1252として解釈できるものは置き換え、それ以外の制御文字はそのまま残す
+        return html.unescape(f'&#{number};') or chr(number)
+    return chr(number)
+
+def _is_card(frame):
+    return frame[0] == 'li' and 'catch_item' in frame[1]
+
+class _TagEventParser(HTMLParser):
+    """BeautifulSoup(html.parser)の木構築と同じ規則でタグの開閉と文字列の区切りを追う基底クラス
+
+    - 空要素タグは開いた直後に閉じ、後から来た同名の終了タグは無視する
+    - 終了タグは直近の同名タグまでを閉じ、開いていないタグの終了タグは何も閉じない
+    - 文字列はタグ・コメントなどの境界で区切り、空白のみの文字列は1文字に畳む
+    スタックの各要素は [タグ名, クラス集合, 閉じるときに呼ぶ処理のリスト]。
+    """
+
+    def __init__(self, text, ancestors=(), already_closed=()):
+        super().__init__(convert_charrefs=False)
+        self.text = text
+        self.line_offsets = None
+        self.stack = [[tag, classes, []] for tag, classes in ancestors]
+        # 開始タグだけで閉じた空要素タグの残数（後から来た同名の終了タグを無視するため）
+        self.already_closed = Counter(already_closed)
+        self.container_stack = [f[0] for f in self.stack if f[0] in _STRING_CONTAINER_TAGS]
+        self.preserve_depth = sum(f[0] in _PRESERVE_WHITESPACE_TAGS for f in self.stack)
+        self.base_depth = len(self.stack)
+        self.pending = []
+
+    def _offset(self):
+        if self.line_offsets is None:
+            self.line_offsets = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        line, col = self.getpos()
+        return self.line_offsets[line - 1] + col
+
+    # --- 派生クラスで上書きする処理 ---
+    def on_push(self, frame):
+        pass
+
+    def on_pop(self, frame, closed_by):
+        pass
+
+    def on_string(self, data, kind):
+        pass
+
+    # --- 文字列 ---
+    def flush(self, kind=None):
+        """溜めた文字列を1つの文字列として確定する（BeautifulSoup.endData相当）"""
+        if not self.pending:
+            return
+        data = ''.join(self.pending)
+        self.pending = []
+        if self.preserve_depth == 0 and not data.strip(_ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if kind is None:
+            kind = self.container_stack[-1] if self.container_stack else 'text'
+        self.on_string(data, kind)
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.pending.append(character if character is not None else f'&{name}')
+
+    def handle_charref(self, name):
+        self.pending.append(_resolve_charref(name))
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_decl(self, decl):
+        self.flush()
+
+    def handle_pi(self, data):
+        self.flush()
+
+    def unknown_decl(self, data):
+        self.flush()
+        if data.upper().startswith('CDATA['):
+            self.pending.append(data[len('CDATA['):])
+            self.flush('cdata')
+
+    # --- タグ ---
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.flush()
+        classes = set((dict(attrs).get('class') or '').split())
+        frame = [tag, classes, []]
+        self.stack.append(frame)
+        if tag in _STRING_CONTAINER_TAGS:
+            self.container_stack.append(tag)
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += 1
+        self.on_push(frame)
+        if handle_empty_element and tag in _VOID_TAGS:
+            self._pop_to(tag, 'start_tag')
+            self.already_closed[tag] += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        # BeautifulSoupと同じく、空要素の残数は確認せずに閉じる
+        self.flush()
+        self._pop_to(tag, 'start_tag')
+
+    def handle_endtag(self, tag):
+        if self.already_closed[tag] > 0:
+            self.already_closed[tag] -= 1
+            return
+        self.flush()
+        self._pop_to(tag, 'end_tag')
+
+    def _pop_to(self, tag, closed_by):
+        """直近の同名タグまでスタックを閉じる（同名タグがなければ何もしない）"""
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                break
+        else:
+            return
+        # 引き継いだ祖先要素は閉じない（祖先のタグで閉じる場合は、その内側をすべて暗黙に閉じる）
+        while len(self.stack) > max(i, self.base_depth):
+            self._pop(closed_by if len(self.stack) == i + 1 else 'implicit')
+
+    def _pop(self, closed_by):
+        """スタック末尾の要素を閉じる
+
+        closed_by は、処理中の開始タグ（空要素・自己終了）で閉じた場合 'start_tag'、
+        処理中の終了タグで閉じた場合 'end_tag'、外側の終了タグで暗黙に閉じた場合 'implicit'、
+        文書の終端で閉じた場合 'eof'。
+        """
+        frame = self.stack.pop()
+        for close in reversed(frame[2]):
+            close()
+        if frame[0] in _STRING_CONTAINER_TAGS:
+            self.container_stack.pop()
+        if frame[0] in _PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth -= 1
+        self.on_pop(frame, closed_by)
+
+    def close(self):
+        super().close()
+        self.flush()
+        self.close_all()
+
+    def close_all(self):
+        """開いている要素をすべて閉じる"""
+        while len(self.stack) > self.base_depth:
+            self._pop('eof')
+
+class _CardBoundaryScanner(_TagEventParser):
+    """ページ全体を走査し、li.catch_item の範囲と、その時点の祖先要素を記録する
+
+    文字列は扱わないため、ページ全体に対する処理はタグの開閉の追跡だけで済む。
+    入れ子になったカードも soup.select('li.catch_item') と同じく文書順にすべて記録する。
+    """
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.cards = []
+        self.open_cards = []
+        # HTMLParserがfeed中（'feed'）とclose中（'close'）のどちらで解析しているか
+        self.phase = 'feed'
+
+    def close(self):
+        self.phase = 'close'
+        super().close()
+
+    def flush(self, kind=None):
+        self.pending = []
+
+    def handle_data(self, data):
+        pass
+
+    def handle_entityref(self, name):
+        pass
+
+    def handle_charref(self, name):
+        pass
+
+    def on_push(self, frame):
+        if _is_card(frame):
+            card = {
+                'start': self._offset(),
+                'end': None,
+                'ancestors': [(f[0], f[1]) for f in self.stack[:-1]],
+                'already_closed': +self.already_closed,
+                'phase': self.phase,
+            }
+            self.cards.append(card)
+            self.open_cards.append(card)
+
+    def on_pop(self, frame, closed_by):
+        if not _is_card(frame):
+            return
+        # 処理中のタグで閉じた場合はタグの末尾まで、暗黙に閉じた場合は終了タグの直前までがカード
+        if closed_by == 'start_tag':
+            # 属性値の中に'>'があり得るため、開始タグは解析済みのタグ文字列の長さで末尾を求める
+            end = self._offset() + len(self.get_starttag_text())
+        elif closed_by == 'end_tag':
+            # HTMLParserは終了タグを最初の'>'までとして扱う
+            end = self.text.find('>', self._offset())
+            end = len(self.text) if end == -1 else end + 1
+        elif closed_by == 'implicit':
+            end = self._offset()
+        else:
+            end = len(self.text)
+        self.open_cards.pop()['end'] = end
+
+class _CardClosed(Exception):
+    """抽出中のカードが閉じたことを知らせ、以降の解析を打ち切る"""
+
+class _CardFieldExtractor(_TagEventParser):
+    """カードの開始位置からページを解析し、店名・日付・魚の行を取り出す
+
+    祖先要素と空要素の状態はページ全体の走査時のものを引き継ぎ、カードが閉じた時点で解析を打ち切る。
+    HTMLParserは文字参照などの判定でページの後ろの部分まで参照するため、カード以降の文字列も渡す。
+    """
+
+    def __init__(self, text, ancestors, already_closed):
+        super().__init__(text, ancestors, already_closed)
+        self.card = None
+        self.captures = []
+        self.open_rows = []
+
+    def on_pop(self, frame, closed_by):
+        if len(self.stack) == self.base_depth:
+            raise _CardClosed()
+
+    def _has_ancestor(self, predicate):
+        """現在の要素を除く祖先要素に条件を満たすものがあるか（soupsieveの子孫結合子と同じ判定）"""
+        return any(predicate(frame) for frame in self.stack[:-1])
+
+    def _capture(self, frame, on_close):
+        """要素が閉じるまでの .text に相当する文字列を集め、閉じたときに on_close(text) を呼ぶ"""
+        kinds = frozenset({frame[0]}) if frame[0] in _STRING_CONTAINER_TAGS else _TEXT_KINDS
+        capture = (kinds, [])
+        self.captures.append(capture)
+
+        def close():
+            # 要素は入れ子の順に閉じるため、対応するバッファは常に末尾にある
+            top = self.captures.pop()
+            assert top is capture
+            on_close(''.join(capture[1]))
+        frame[2].append(close)
+
+    def on_string(self, data, kind):
+        for kinds, buf in self.captures:
+            if kind in kinds:
+                buf.append(data)
+
+    def on_push(self, frame):
+        if self.card is None:
+            # HTML片の最初の要素がカード自身
+            self.card = {'shop_name': None, 'date_text': None, 'fish_rows': []}
+            return
+
+        # 各項目は文書順で最初に現れた要素のみを採用する（select_one と同じ）
+        card = self.card
+        tag, classes = frame[0], frame[1]
+        if tag == 'h2' and card['shop_name'] is None \
+                and self._has_ancestor(lambda f: f[0] == 'header'):
+            card['shop_name'] = ''
+            self._capture(frame, lambda text: card.__setitem__('shop_name', text))
+        if 'catch_item_date' in classes and card['date_text'] is None:
+            card['date_text'] = ''
+            self._capture(frame, lambda text: card.__setitem__('date_text', text))
+        if tag == 'tr' and self._has_ancestor(lambda f: 'catch_item_fish' in f[1]):
+            row = [None, []]
+            card['fish_rows'].append(row)
+            self.open_rows.append(row)
+
+            def close_row():
+                top = self.open_rows.pop()
+                assert top is row
+            frame[2].append(close_row)
+        if tag == 'th':
+            for row in self.open_rows:
+                if row[0] is None:
+                    row[0] = ''
+                    self._capture(frame, lambda text, row=row: row.__setitem__(0, text))
+        if tag == 'td':
+            for row in self.open_rows:
+                slot = len(row[1])
+                row[1].append('')
+                self._capture(frame, lambda text, row=row, slot=slot: row[1].__setitem__(slot, text))
+
+def _extract_fast_card(text, start, ancestors, already_closed, phase):
+    parser = _CardFieldExtractor(text[start:], ancestors, already_closed)
+    try:
+        # ページ全体の走査と同じ段階（feed / close）から解析を始め、同じ字句解析の結果を得る
+        if phase == 'feed':
+            parser.feed(parser.text)
+        else:
+            parser.rawdata = parser.text
+        parser.close()
+    except _CardClosed:
+        pass
+    if parser.card is None:
+        raise ValueError(f"カードの要素を解析できませんでした (位置 {start})")
+    card = parser.card
+    card['fish_rows'] = [tuple(row) for row in card['fish_rows']]
+    return card
+
+def _scan(content):
+    text = decode_page(content)
+    scanner = _CardBoundaryScanner(text)
+    scanner.feed(text)
+    scanner.close()
+    return text, scanner.cards
+
+def scan_cards(content):
+    """ページ全体からカードの範囲を調べ、カードごとに (card_html, 解析に必要な文脈) のリストを返す"""
+    text, cards = _scan(content)
+    return [
+        (text[card['start']:card['end']],
+         (text, card['start'], card['ancestors'], card['already_closed'], card['phase']))
+        for card in cards
+    ]
+
+def extract_cards_fast(content):
+    """木構造を作らずにカードの範囲だけを調べ、各カードの中身は必要になったときに解析する"""
+    return [
+        (card_html, lambda context=context: _extract_fast_card(*context))
+        for card_html, context in scan_cards(content)
+    ]
+
+# --- バックエンドの選択 ---
+PARSER_BACKENDS = {
+    'bs4': extract_cards_bs4,
+    'fast': extract_cards_fast,
+}
+
+def get_parser_backend(name):
+    """名前からカード抽出バックエンドを取得する"""
+    try:
+        return PARSER_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"未知のパーサーバックエンドです: {name} (利用可能: {', '.join(PARSER_BACKENDS)})"
+        ) from None
@@ -2,11 +2,15 @@ import requests
 import logging
 from datetime import datetime, timedelta
 import re
-from bs4 import BeautifulSoup
 import json
+import hashlib
 
 # db.pyから必要な関数をインポート
-from db import insert_daily_conditions, insert_fishing_results
+from db import (
+    insert_daily_conditions, insert_fishing_results,
+    get_cached_card_hashes, insert_card_hashes, evict_card_cache
+)
+from card_parser import get_parser_backend, build_card_results
 
 # --- 初期設定 ---
 logging.basicConfig(format='%(asctime)s %(levelname)s:%(message)s', level=logging.INFO)
@@ -159,6 +163,16 @@ def get_marine_and_tide_data():
         logging.error("データ解析中に予期せぬエラーが発生しました。", exc_info=True)
 
 # --- 釣果データ取得 ---
+CARD_CACHE_MAX_AGE_DAYS = 30
+# カードの抽出・正規化の処理を修正したら上げる（キャッシュ済みのカードも解析し直される）
+CARD_CACHE_VERSION = 1
+# 釣果カードの抽出に使うバックエンド（'fast' または 'bs4'。card_parser.py を参照）
+CARD_PARSER_BACKEND = 'fast'
+
+def card_hash(card_html):
+    """カードHTMLの内容ハッシュを返す（未変更カードの判定に使用）"""
+    return hashlib.sha256(f"{CARD_CACHE_VERSION}\n{card_html}".encode('utf-8')).hexdigest()
+
 def get_fishing_data():
     """釣割から神奈川・千葉・東京の釣果データを取得し、DBに保存する"""
     logging.info("釣果データの取得を開始...")
@@ -170,6 +184,12 @@ def get_fishing_data():
     }
     
     all_results = []
+    new_card_hashes = set()
+    cache_hits = 0
+    cache_misses = 0
+
+    extract_cards = get_parser_backend(CARD_PARSER_BACKEND)
+    evict_card_cache(CARD_CACHE_MAX_AGE_DAYS)
 
     for pref_name, area_id in target_prefs.items():
         try:
@@ -178,46 +198,20 @@ def get_fishing_data():
             response = requests.get(url, headers=HEADERS, timeout=20)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            catch_cards = soup.select('li.catch_item')
+            catch_cards = extract_cards(response.content)
             logging.info(f"[{pref_name}] {len(catch_cards)}件の釣果情報を発見。")
-            
-            for card in catch_cards:
-                shop_name_tag = card.select_one('header h2')
-                shop_name = shop_name_tag.text.strip() if shop_name_tag else "N/A"
 
-                date_tag = card.select_one('.catch_item_date')
-                date_text = date_tag.text.strip() if date_tag else "N/A"
+            # 前回から内容が変わっていないカードは解析・DB書き込みを省略する
+            hashed_cards = [(card_hash(card_html), extract) for card_html, extract in catch_cards]
+            cached_hashes = get_cached_card_hashes({h for h, _ in hashed_cards})
 
-                match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', date_text)
-                if not match:
+            for h, extract in hashed_cards:
+                if h in cached_hashes or h in new_card_hashes:
+                    cache_hits += 1
                     continue
-                
-                year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
-                report_date = f"{year:04d}-{month:02d}-{day:02d}"
-
-                fish_rows = card.select('.catch_item_fish tr')
-                for row in fish_rows:
-                    fish_name_tag = row.select_one('th')
-                    
-                    if not fish_name_tag:
-                        continue
-
-                    fish_name = re.sub(r'[（\(].*?[）\)]', '', fish_name_tag.text).strip()
-                    if not fish_name:
-                        continue
-                        
-                    details_tags = row.select('td')
-                    details = ' '.join(td.text.strip() for td in details_tags).strip()
-                    
-                    all_results.append({
-                        "report_date": report_date,
-                        "prefecture": pref_name,
-                        "shop_name": shop_name,
-                        "fish_name": fish_name,
-                        "details": details
-                    })
+                cache_misses += 1
+                all_results.extend(build_card_results(extract(), pref_name))
+                new_card_hashes.add(h)
         
         except requests.exceptions.RequestException as e:
             logging.error(f"[{pref_name}] の釣果取得に失敗: {e}")
@@ -227,5 +221,8 @@ def get_fishing_data():
 
     if all_results:
         insert_fishing_results(all_results)
-    
+    # DBへの保存が済んでからキャッシュに登録する
+    insert_card_hashes(new_card_hashes)
+
+    logging.info(f"カードキャッシュ: ヒット {cache_hits}件 / ミス {cache_misses}件")
     logging.info("釣果データの収集処理が完了しました。")
\ No newline at end of file
@@ -64,6 +64,13 @@ def create_tables():
             moon_set TEXT
         )''')
 
+        # 4. 釣果カードのキャッシュ（カードHTMLのハッシュで未変更カードの再解析を省く）
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS card_cache (
+            card_hash TEXT PRIMARY KEY,
+            last_seen_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )''')
+
         logging.info("テーブルの準備が完了しました。")
 
 def insert_daily_conditions(data):
@@ -139,3 +146,46 @@ def insert_fishing_results(results_list):
         conn.commit()
         if inserted_count > 0:
             logging.info(f"{inserted_count}件の新しい釣果データをDBに保存しました。")
+
+def get_cached_card_hashes(card_hashes):
+    """キャッシュ済みのカードハッシュを返し、最終確認日時を更新する"""
+    if not card_hashes:
+        return set()
+    with get_connection() as conn:
+        cached = set()
+        hashes = list(card_hashes)
+        # SQLiteのプレースホルダ上限を避けるため分割して問い合わせる
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT card_hash FROM card_cache WHERE card_hash IN ({placeholders})',
+                chunk
+            ).fetchall()
+            cached.update(row[0] for row in rows)
+        if cached:
+            conn.executemany(
+                "UPDATE card_cache SET last_seen_at = datetime('now') WHERE card_hash = ?",
+                [(h,) for h in cached]
+            )
+        return cached
+
+def insert_card_hashes(card_hashes):
+    """解析・保存が完了したカードのハッシュをキャッシュに登録する"""
+    if not card_hashes:
+        return
+    with get_connection() as conn:
+        conn.executemany('''
+        INSERT OR REPLACE INTO card_cache (card_hash, last_seen_at)
+        VALUES (?, datetime('now'))
+        ''', [(h,) for h in card_hashes])
+
+def evict_card_cache(max_age_days=30):
+    """一定期間確認されていないカードのキャッシュを削除する"""
+    with get_connection() as conn:
+        cursor = conn.execute(
+            "DELETE FROM card_cache WHERE last_seen_at < datetime('now', ?)",
+            (f'-{int(max_age_days)} days',)
+        )
+        if cursor.rowcount > 0:
+            logging.info(f"{cursor.rowcount}件の古いカードキャッシュを削除しました。")
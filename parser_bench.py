@@ -0,0 +1,95 @@
+# parser_bench.py
+# 釣果カード抽出バックエンド（card_parser.py）の処理速度を、導入前の処理（base）と比較します。
+# 抽出結果の一致は tests/test_card_parser.py（pytest）で tests/pages/ のページを使って確認します。
+#   python parser_bench.py record   … 釣割の一覧ページを tests/pages/ に保存する（一致確認の対象にも加わる）
+#   python parser_bench.py          … tests/pages/ のページで各バックエンドの処理速度を計測する
+import os
+import sys
+import time
+import logging
+import requests
+from bs4 import BeautifulSoup
+
+from card_parser import PARSER_BACKENDS, scan_cards, _extract_bs4_card
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'pages')
+TARGET_PREFS = {
+    "神奈川": "14",
+    "千葉": "12",
+    "東京": "13",
+}
+
+def record_pages():
+    """釣割の一覧ページを取得し、そのままのバイト列で保存する
+
+    コミットする前に、広告・計測用のスクリプトなど釣果に関係しない部分を確認・削除すること。
+    """
+    from ch import HEADERS
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for pref_name, area_id in TARGET_PREFS.items():
+        url = f"https://www.chowari.jp/catcharea/?area={area_id}"
+        response = requests.get(url, headers=HEADERS, timeout=20)
+        response.raise_for_status()
+        path = os.path.join(PAGES_DIR, f"recorded_area_{area_id}_{time.strftime('%Y%m%d')}.html")
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        logging.info(f"[{pref_name}] {path} に保存しました。")
+
+def load_pages():
+    """保存済みページを (ファイル名, バイト列) のリストで返す"""
+    pages = []
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith('.html'):
+            with open(os.path.join(PAGES_DIR, name), 'rb') as f:
+                pages.append((name, f.read()))
+    return pages
+
+def _time_per_page(pages, repeat, func):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, content in pages:
+            func(content)
+    return (time.perf_counter() - start) / (repeat * len(pages))
+
+def parse_baseline(content):
+    """バックエンド導入前の処理（ページ全体をBeautifulSoupで解析し、全カードをselectで抽出）"""
+    soup = BeautifulSoup(content, 'html.parser')
+    for card in soup.select('li.catch_item'):
+        _extract_bs4_card(card)
+
+def benchmark(pages, repeat=20):
+    """導入前の処理と各バックエンドの処理時間を、全カード解析時とキャッシュ全ヒット時に分けて計測する"""
+    total_bytes = sum(len(content) for _, content in pages)
+
+    elapsed = _time_per_page(pages, repeat, parse_baseline)
+    throughput = total_bytes / len(pages) / elapsed / 1024 / 1024
+    logging.info(f" base: 全カード解析 {elapsed * 1000:8.2f} ms/ページ  {throughput:6.2f} MB/s")
+
+    for backend_name, backend in PARSER_BACKENDS.items():
+        def parse_all(content):
+            for _, extract in backend(content):
+                extract()
+
+        elapsed = _time_per_page(pages, repeat, parse_all)
+        throughput = total_bytes / len(pages) / elapsed / 1024 / 1024
+        logging.info(f"{backend_name:>5}: 全カード解析 {elapsed * 1000:8.2f} ms/ページ  {throughput:6.2f} MB/s")
+
+    # キャッシュに全カードがヒットした場合はカードの範囲を調べるだけで済む
+    elapsed = _time_per_page(pages, repeat, scan_cards)
+    logging.info(f" scan: 全カードヒット {elapsed * 1000:8.2f} ms/ページ")
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s %(levelname)s:%(message)s'
+    )
+
+    if len(sys.argv) > 1 and sys.argv[1] == 'record':
+        record_pages()
+        return
+
+    benchmark(load_pages())
+
+if __name__ == "__main__":
+    main()
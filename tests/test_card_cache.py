@@ -0,0 +1,112 @@
+# 釣果カードのキャッシュ（db.py の card_cache と ch.get_fishing_data）の動作を一時DBで確認する
+import os
+import re
+import sqlite3
+
+import pytest
+
+import card_parser
+import ch
+import db
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), 'pages')
+
+with open(os.path.join(PAGES_DIR, 'chowari_sample.html'), 'rb') as f:
+    SAMPLE_PAGE = f.read()
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """作業ディレクトリを一時ディレクトリに移し、空のDBを用意する"""
+    monkeypatch.chdir(tmp_path)
+    db.create_tables()
+
+@pytest.fixture
+def pages(monkeypatch):
+    """地域IDごとに返すページ（既定では全地域で同じサンプルページ）"""
+    pages = {'14': SAMPLE_PAGE, '12': SAMPLE_PAGE, '13': SAMPLE_PAGE}
+
+    def fake_get(url, headers=None, timeout=None):
+        return FakeResponse(pages[url.rsplit('=', 1)[1]])
+    monkeypatch.setattr(ch.requests, 'get', fake_get)
+    return pages
+
+def run_and_count(caplog):
+    """get_fishing_data を実行し、ログに出たキャッシュのヒット数・ミス数を返す"""
+    caplog.clear()
+    with caplog.at_level('INFO'):
+        ch.get_fishing_data()
+    for message in caplog.messages:
+        match = re.search(r'カードキャッシュ: ヒット (\d+)件 / ミス (\d+)件', message)
+        if match:
+            return int(match.group(1)), int(match.group(2))
+    raise AssertionError("キャッシュのログが出力されていません。")
+
+def count_rows(table):
+    with db.get_connection() as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+def test_hits_and_misses(temp_db, pages, caplog, monkeypatch):
+    # 1回目: 4件のカードはすべてミス。同じカードが他の県のページにも載っている分はヒット
+    assert run_and_count(caplog) == (8, 4)
+    assert count_rows('card_cache') == 4
+    assert count_rows('fishing_results') == 6
+
+    # 2回目: すべてヒットし、解析もDBへの書き込みも行わない
+    calls = []
+    monkeypatch.setattr(ch, 'build_card_results', lambda *args: calls.append(args) or [])
+    monkeypatch.setattr(ch, 'insert_fishing_results', lambda results: calls.append(results))
+    assert run_and_count(caplog) == (12, 0)
+    assert calls == []
+
+def test_changed_card_is_a_miss(temp_db, pages, caplog):
+    run_and_count(caplog)
+    changed = SAMPLE_PAGE.replace('12-45匹'.encode('utf-8'), '12-50匹'.encode('utf-8'))
+    pages.update({'14': changed, '12': changed, '13': changed})
+    assert run_and_count(caplog) == (11, 1)
+
+def test_bs4_backend_builds_no_tree_on_full_hit(temp_db, pages, caplog, monkeypatch):
+    monkeypatch.setattr(ch, 'CARD_PARSER_BACKEND', 'bs4')
+    assert run_and_count(caplog) == (8, 4)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("キャッシュヒット時にBeautifulSoupの木を作っています。")
+    monkeypatch.setattr(card_parser, 'BeautifulSoup', fail)
+    assert run_and_count(caplog) == (12, 0)
+
+def test_hashes_recorded_only_after_insert(temp_db, pages, caplog, monkeypatch):
+    def failing_insert(results):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(ch, 'insert_fishing_results', failing_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        ch.get_fishing_data()
+    assert count_rows('card_cache') == 0
+
+    # 保存に失敗したカードは次回も解析される
+    monkeypatch.setattr(ch, 'insert_fishing_results', db.insert_fishing_results)
+    assert run_and_count(caplog) == (8, 4)
+    assert count_rows('fishing_results') == 6
+
+def test_eviction_by_last_seen_at(temp_db):
+    db.insert_card_hashes({'old', 'recent', 'refreshed'})
+    with db.get_connection() as conn:
+        conn.execute("UPDATE card_cache SET last_seen_at = datetime('now', '-40 days') WHERE card_hash != 'recent'")
+
+    # 参照されたカードは最終確認日時が更新され、削除の対象から外れる
+    assert db.get_cached_card_hashes({'refreshed', 'unknown'}) == {'refreshed'}
+    db.evict_card_cache(30)
+
+    with db.get_connection() as conn:
+        remaining = {row[0] for row in conn.execute('SELECT card_hash FROM card_cache')}
+    assert remaining == {'recent', 'refreshed'}
+
+def test_version_bump_invalidates_cache(temp_db, pages, caplog, monkeypatch):
+    run_and_count(caplog)
+    monkeypatch.setattr(ch, 'CARD_CACHE_VERSION', ch.CARD_CACHE_VERSION + 1)
+    assert run_and_count(caplog) == (8, 4)
@@ -0,0 +1,125 @@
+# 高速版のカード抽出が、ページ全体をBeautifulSoupで解析した結果と一致するかを確認する
+import glob
+import os
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+
+from card_parser import PARSER_BACKENDS, build_card_results, _extract_bs4_card
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), 'pages')
+PAGES = sorted(glob.glob(os.path.join(PAGES_DIR, '*.html')))
+
+def reference_cards(content):
+    """従来どおりページ全体をBeautifulSoupで解析したカードの生データ"""
+    soup = BeautifulSoup(content, 'html.parser')
+    return [_extract_bs4_card(card) for card in soup.select('li.catch_item')]
+
+def extracted_cards(backend_name, content):
+    return [extract() for _, extract in PARSER_BACKENDS[backend_name](content)]
+
+def assert_parity(content):
+    expected = reference_cards(content)
+    for backend_name in PARSER_BACKENDS:
+        assert extracted_cards(backend_name, content) == expected, backend_name
+
+@pytest.mark.parametrize('path', PAGES, ids=os.path.basename)
+def test_recorded_pages_parity(path):
+    with open(path, 'rb') as f:
+        content = f.read()
+    assert_parity(content)
+
+def test_sample_page_results():
+    with open(os.path.join(PAGES_DIR, 'chowari_sample.html'), 'rb') as f:
+        content = f.read()
+    results = [
+        row
+        for card in extracted_cards('fast', content)
+        for row in build_card_results(card, '神奈川')
+    ]
+    assert results[0] == {
+        "report_date": "2024-05-03",
+        "prefecture": "神奈川",
+        "shop_name": "大栄丸",
+        "fish_name": "アジ",
+        "details": "15-28cm 12-45匹"
+    }
+    # 日付のないカードは除外される
+    assert '長井 丸伊丸' not in {row['shop_name'] for row in results}
+
+def test_shift_jis_declared_late():
+    with open(os.path.join(PAGES_DIR, 'edge_shift_jis.html'), 'rb') as f:
+        content = f.read()
+    cards = extracted_cards('fast', content)
+    assert cards[0]['shop_name'] == '鴨居 一郎丸'
+
+@pytest.mark.parametrize('html', [
+    # 店名の中に日付の要素があり、どちらも同じ文字列を集める
+    '<ul><li class="catch_item"><header><h2><span class="catch_item_date">2024年5月3日</span> 大栄丸</h2></header>'
+    '<table class="catch_item_fish"><tr><th>アジ</th><td>5匹</td></tr></table></li></ul>',
+    # td の中の入れ子の表
+    '<ul><li class="catch_item"><header><h2>丸十丸</h2></header><p class="catch_item_date">2024年6月1日</p>'
+    '<table class="catch_item_fish"><tr><th>アジ</th><td><table><tr><td>10匹</td></tr></table> 20cm</td></tr>'
+    '</table></li></ul>',
+    # 自己終了の td の後に空白
+    '<ul><li class="catch_item"><table class="catch_item_fish"><tr><th>a</th><td/> <td>x</td></tr></table></li></ul>',
+    # 暗黙に閉じられるカードの末尾にある、セミコロンのない文字参照
+    '<div><li class="catch_item"><p class="catch_item_date">2024年1月1日&amp</div>',
+    # 数字の続かない'&#'（HTMLParserはここで解析を中断し、残りをcloseで解析する）
+    '<ul><li class="catch_item"><table class="catch_item_fish"><tr><th>アジ</th><td>#&#No.1;</td></tr>'
+    '<tr><th>サバ</th><td>5匹</td></tr></table></li><li class="catch_item">&#x;<p class="catch_item_date">x</p></li></ul>',
+    # 属性値に'>'を含む自己終了のカード
+    '<ul><li class="catch_item" data-x=">"/><li class="catch_item" data-x=">"><header><h2>b</h2></header></li></ul>',
+])
+def test_edge_case_parity(html):
+    assert_parity(html.encode('utf-8'))
+
+# --- ランダムなHTMLでの一致確認 ---
+_TAGS = [
+    'li class="catch_item"', 'LI CLASS="foo catch_item"', 'li class="catch_item" data-x=">"', 'li', 'header', 'h2',
+    'p class="catch_item_date"', 'span class="catch_item_date"', 'table class="catch_item_fish"',
+    'div class="catch_item_fish"', 'tr', 'th', 'td', 'div', 'span', 'b', 'ul', 'p',
+    'pre', 'textarea', 'script', 'style', 'rt', 'template',
+]
+_VOIDS = ['br', 'BR', 'img src=x', 'hr', 'br class=catch_item_date']
+_TEXTS = [
+    'アジ', '2024年5月3日', ' ', '\n  ', '\t', '(大)', '10匹', '&amp;', '&amp', '&#65;', '&#x41;',
+    '&#150;', '&#x;', '&#65a;', '&#No.1;', '&foo;', '&lt;', 'a < b', '<!-- c -->', '<![CDATA[ z ]]>',
+]
+
+def _random_fragment(rng, depth=0):
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        choice = rng.random()
+        if choice < 0.35 and depth < 6:
+            tag = rng.choice(_TAGS)
+            name = tag.split()[0]
+            inner = _random_fragment(rng, depth + 1)
+            close = rng.random()
+            if close < 0.75:
+                parts.append(f'<{tag}>{inner}</{name}>')
+            elif close < 0.85:
+                parts.append(f'<{tag}>{inner}')
+            elif close < 0.9:
+                parts.append(f'<{tag}/>')
+            else:
+                parts.append(f'<{tag}>{inner}</{rng.choice(_TAGS).split()[0]}>')
+        elif choice < 0.45:
+            parts.append(f'<{rng.choice(_VOIDS)}{"/" if rng.random() < 0.3 else ""}>')
+        elif choice < 0.5:
+            parts.append(f'</{rng.choice(["br", "div", "li", "td", "tr", "p", "hr"])}>')
+        else:
+            parts.append(rng.choice(_TEXTS))
+    return ''.join(parts)
+
+def test_random_markup_parity():
+    for seed in range(500):
+        rng = random.Random(seed)
+        page = '<ul>' + ''.join(
+            f'<li class="catch_item">{_random_fragment(rng)}</li>' if rng.random() < 0.7
+            else _random_fragment(rng)
+            for _ in range(rng.randint(1, 4))
+        ) + '</ul>'
+        expected = reference_cards(page)
+        assert extracted_cards('fast', page.encode('utf-8')) == expected, page